@@ -9,32 +9,135 @@ Telegram Media Archiver Bot
 import os
 import json
 import logging
+import logging.handlers
+import queue
+import atexit
+import time
 from datetime import datetime
 from pathlib import Path
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import itertools
+import dataclasses
+from dataclasses import dataclass, field
 
-from telegram import Update
+import aiofiles
+import aiohttp
+from telegram import Bot, Chat, File, Message, Update
 from telegram.ext import Application, MessageHandler, filters, ContextTypes
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Загрузка переменных окружения
 load_dotenv()
 
-# Конфигурация логирования
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+# Конфигурация логирования: записи передаются через очередь в отдельный
+# поток, который и пишет их в stderr, не блокируя event loop
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+))
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+_root_logger = logging.getLogger()
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_root_logger.setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Константы
 BOT_TOKEN = os.getenv('BOT_TOKEN')
 DOWNLOAD_DIR = Path(os.getenv('DOWNLOAD_DIR', 'downloads'))
 MEDIA_GROUPS_DIR = DOWNLOAD_DIR / 'media_groups'
+# Размер журнала метаданных (байт), после которого он сворачивается в metadata.json
+JOURNAL_COMPACT_SIZE = 1024 * 1024
+# Число потоков для блокирующих операций с диском
+IO_WORKERS = min(8, os.cpu_count() or 1)
+# Максимум одновременных скачиваний с серверов Telegram
+MAX_CONCURRENT_DOWNLOADS = int(os.getenv('MAX_CONCURRENT_DOWNLOADS', '4'))
+# Размер блока (байт) при потоковом скачивании фото на диск
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Буфер записи файла фото: блоки скачивания объединяются в крупные write()
+WRITE_BUFFER_SIZE = 1024 * 1024
+# Кэш ответов getFile: размер и время жизни (сек). Telegram гарантирует
+# работу ссылки на файл не меньше часа, запись живёт чуть меньше
+FILE_CACHE_SIZE = 1024
+FILE_CACHE_TTL = 50 * 60
+# Пауза (сек) после последнего сообщения альбома перед его сохранением
+MEDIA_GROUP_DELAY = 1.0
 
 # Временное хранилище для группировки медиа
 media_group_buffer = defaultdict(list)
+# Отложенные сохранения альбомов: media_group_id -> таймер
+media_group_timers: dict[str, asyncio.TimerHandle] = {}
+
+
+def _json_dumps(data, indent: bool = False) -> bytes:
+    """Сериализация в JSON (UTF-8), через orjson если он установлен"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(
+        data, ensure_ascii=False, indent=2 if indent else None, default=dataclasses.asdict
+    ).encode('utf-8')
+
+
+def _json_loads(data: bytes):
+    """Разбор JSON, через orjson если он установлен"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class BufferedMsg:
+    """Компактная запись о сообщении альбома в буфере
+    
+    Хранит только поля, нужные для сохранения группы, чтобы объект
+    Message не удерживался в памяти до срабатывания таймера.
+    """
+    
+    __slots__ = (
+        'photo_id', 'photo_size', 'width', 'height',
+        'caption', 'sender', 'chat_id', 'chat_type', 'message_id'
+    )
+    
+    def __init__(self, message: Message):
+        photo = message.photo[-1] if message.photo else None  # Самое большое фото
+        self.photo_id = photo.file_id if photo else None
+        self.photo_size = photo.file_size if photo else None
+        self.width = photo.width if photo else None
+        self.height = photo.height if photo else None
+        self.caption = message.caption
+        user = message.from_user
+        self.sender = (user.username or user.full_name) if user else None
+        self.chat_id = message.chat_id
+        self.chat_type = message.chat.type
+        self.message_id = message.message_id
+
+
+@dataclass(slots=True)
+class GroupInfo:
+    """Информация о группе, сохраняемая в info.json"""
+    media_group_id: str
+    date: str
+    caption: str = ''
+    files: list = field(default_factory=list)
+    sender: str = ''
+    chat_id: int | None = None
+    message_count: int = 0
+
+
+def _write_json_sync(path: Path, data: dict | GroupInfo):
+    """Атомарная запись JSON в файл (выполняется в пуле потоков)"""
+    tmp_file = path.with_name(path.name + '.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(_json_dumps(data, indent=True))
+    os.replace(tmp_file, path)
 
 
 class MediaArchiver:
@@ -44,99 +147,265 @@ class MediaArchiver:
         self.download_dir = download_dir
         self.media_groups_dir = download_dir / 'media_groups'
         self.metadata_file = download_dir / 'metadata.json'
+        self.journal_file = download_dir / 'metadata.jsonl'
         
         # Создание директорий
         self.media_groups_dir.mkdir(parents=True, exist_ok=True)
         
         # Загрузка или создание метаданных
         self.metadata = self._load_metadata()
+        
+        # Счётчики для /stats, обновляются вместе с метаданными
+        self.groups_count = len(self.metadata['groups'])
+        self.total_files = self.metadata['total_files']
+        
+        # Номера папок групп. Альбомы сохраняются параллельно и могут попасть
+        # в метаданные не по порядку, а после неудачного сохранения на диске
+        # остаётся незаписанная в метаданные папка — поэтому счёт идёт от
+        # наибольшего номера среди метаданных и существующих папок
+        folders = [group['folder'] for group in self.metadata['groups']]
+        folders += [path.name for path in self.media_groups_dir.glob('group_*')]
+        last_group = max(
+            (int(number) for number in (name.rpartition('_')[2] for name in folders)
+             if number.isdigit()),
+            default=0
+        )
+        self._group_counter = itertools.count(last_group + 1)
+        # Заранее собранные шаблоны путей групп и имён файлов
+        self._group_dir_tmpl = str(self.media_groups_dir) + os.sep + 'group_{:04d}'
+        self._photo_tmpl = 'photo_%02d.%s'
+        
+        # Журнал метаданных: одна строка JSON на каждую сохранённую группу
+        self._journal = open(self.journal_file, 'ab')
+        
+        # Пул потоков для работы с диском, чтобы не блокировать event loop
+        self._executor = ThreadPoolExecutor(
+            max_workers=IO_WORKERS,
+            thread_name_prefix='archiver-io'
+        )
+        # Упорядочивает изменения метаданных и операции с журналом
+        self._metadata_lock = asyncio.Lock()
+        # Ограничение параллельных скачиваний (rate limits Telegram)
+        self._download_semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        # HTTP-сессия для скачивания файлов, создаётся при первом скачивании
+        self._session = None
+        # LRU-кэш getFile: file_id -> (время получения, File)
+        self._file_cache: OrderedDict[str, tuple[float, File]] = OrderedDict()
+    
+    async def _run_io(self, func, *args):
+        """Выполнение блокирующей операции с диском в пуле потоков"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Общая HTTP-сессия (создаётся внутри работающего event loop)"""
+        if self._session is None or self._session.closed:
+            # Пул keep-alive соединений: фото альбома качаются по уже
+            # установленным TLS-соединениям, без повторных рукопожатий
+            connector = aiohttp.TCPConnector(
+                limit=32,
+                ttl_dns_cache=300,
+                keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def close(self):
+        """Закрытие HTTP-сессии и журнала при остановке бота"""
+        if self._session is not None:
+            await self._session.close()
+        self._journal.close()
+    
+    async def _get_file(self, bot: Bot, file_id: str) -> File:
+        """Получение File по file_id с кэшированием (повторы и репосты)"""
+        now = time.monotonic()
+        cached = self._file_cache.get(file_id)
+        if cached and now - cached[0] < FILE_CACHE_TTL:
+            self._file_cache.move_to_end(file_id)
+            return cached[1]
+        
+        file = await bot.get_file(file_id)
+        self._file_cache[file_id] = (now, file)
+        self._file_cache.move_to_end(file_id)
+        if len(self._file_cache) > FILE_CACHE_SIZE:
+            self._file_cache.popitem(last=False)
+        return file
     
     def _load_metadata(self) -> dict:
-        """Загрузка метаданных из файла"""
+        """Загрузка метаданных: снимок из metadata.json + записи журнала
+        
+        Вызывается синхронно при создании архиватора, до запуска event loop.
+        """
+        metadata = {'groups': [], 'total_files': 0}
         if self.metadata_file.exists():
-            with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {'groups': [], 'total_files': 0}
+            with open(self.metadata_file, 'rb') as f:
+                metadata = _json_loads(f.read())
+        
+        if self.journal_file.exists():
+            # Группы, уже попавшие в снимок (если сбой случился между
+            # записью снимка и очисткой журнала)
+            known_folders = {group['folder'] for group in metadata['groups']}
+            # Конец последней полной (завершённой '\n') строки журнала
+            complete_size = 0
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        # Недописанная строка после аварийного завершения
+                        logger.warning("Отброшена недописанная запись журнала: %r", line[:100])
+                        break
+                    complete_size += len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = _json_loads(line)
+                    except ValueError:
+                        logger.warning("Пропущена повреждённая запись журнала: %r", line[:100])
+                        continue
+                    if entry['folder'] in known_folders:
+                        continue
+                    metadata['groups'].append(entry)
+                    metadata['total_files'] += entry['files_count']
+            
+            # Обрезка недописанного хвоста, иначе следующая запись
+            # склеится с ним в одну повреждённую строку
+            if complete_size < self.journal_file.stat().st_size:
+                os.truncate(self.journal_file, complete_size)
+        
+        return metadata
+    
+    async def _save_metadata(self):
+        """Сохранение полного снимка метаданных в файл"""
+        await self._run_io(_write_json_sync, self.metadata_file, self.metadata)
+    
+    def _write_journal_sync(self, entry: dict) -> int:
+        """Запись строки в журнал, возвращает его текущий размер"""
+        self._journal.write(_json_dumps(entry) + b'\n')
+        self._journal.flush()
+        return self._journal.tell()
+    
+    def _truncate_journal_sync(self):
+        """Очистка журнала после записи снимка"""
+        self._journal.seek(0)
+        self._journal.truncate()
+    
+    async def _append_journal(self, entry: dict):
+        """Дописывание записи о группе в журнал метаданных
+        
+        Вызывается под self._metadata_lock.
+        """
+        journal_size = await self._run_io(self._write_journal_sync, entry)
+        
+        if journal_size > JOURNAL_COMPACT_SIZE:
+            await self._compact_metadata()
     
-    def _save_metadata(self):
-        """Сохранение метаданных в файл"""
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+    async def _compact_metadata(self):
+        """Сворачивание журнала в снимок metadata.json"""
+        await self._save_metadata()
+        await self._run_io(self._truncate_journal_sync)
+        logger.info("Журнал метаданных свёрнут в %s", self.metadata_file)
     
-    async def save_media_group(self, media_group_id: str, messages: list):
+    async def _download_photo(self, bot: Bot, msg: BufferedMsg, group_dir: Path, idx: int) -> dict:
+        """Скачивание одного фото группы"""
+        async with self._download_semaphore:
+            file = await self._get_file(bot, msg.photo_id)
+            
+            # Имя файла
+            _, dot, file_ext = file.file_path.rpartition('.')
+            if not dot or '/' in file_ext:
+                # Путь без расширения: Telegram хранит фото в JPEG
+                file_ext = 'jpg'
+            filename = self._photo_tmpl % (idx, file_ext)
+            filepath = group_dir / filename
+            
+            # Потоковое скачивание блоками прямо в файл, без загрузки
+            # всего фото в память (file_path содержит полный URL файла)
+            session = self._get_session()
+            try:
+                async with session.get(file.file_path) as response:
+                    response.raise_for_status()
+                    async with aiofiles.open(
+                        filepath, 'wb', buffering=WRITE_BUFFER_SIZE, executor=self._executor
+                    ) as f:
+                        async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                            await f.write(chunk)
+            except aiohttp.ClientResponseError as e:
+                # Текст исключения содержит URL с токеном бота — оставляем только статус
+                raise RuntimeError(
+                    f"HTTP {e.status} при скачивании файла {msg.photo_id}"
+                ) from None
+        
+        logger.info("Сохранено: %s", filepath)
+        return {
+            'file_id': msg.photo_id,
+            'filename': filename,
+            'size': msg.photo_size,
+            'width': msg.width,
+            'height': msg.height
+        }
+    
+    async def save_media_group(self, bot: Bot, media_group_id: str, messages: list[BufferedMsg]):
         """Сохранение медиа-группы на диск"""
         try:
             # Создание папки для группы
-            group_count = len(self.metadata['groups']) + 1
-            group_dir = self.media_groups_dir / f'group_{group_count:04d}'
+            group_count = next(self._group_counter)
+            group_dir = Path(self._group_dir_tmpl.format(group_count))
             group_dir.mkdir(exist_ok=True)
             
             # Информация о группе
-            group_info = {
-                'media_group_id': media_group_id,
-                'date': datetime.now().isoformat(),
-                'caption': '',
-                'files': [],
-                'sender': '',
-                'chat_id': None,
-                'message_count': len(messages)
-            }
+            group_info = GroupInfo(
+                media_group_id=media_group_id,
+                date=datetime.now().isoformat(),
+                message_count=len(messages)
+            )
             
-            # Обработка каждого сообщения в группе
-            for idx, msg in enumerate(messages, 1):
-                # Получение caption из первого сообщения
-                if idx == 1 and msg.caption:
-                    group_info['caption'] = msg.caption
-                
-                # Информация об отправителе
-                if msg.from_user:
-                    group_info['sender'] = msg.from_user.username or msg.from_user.full_name
-                group_info['chat_id'] = msg.chat_id
-                
-                # Скачивание фото
-                if msg.photo:
-                    photo = msg.photo[-1]  # Самое большое фото
-                    file = await photo.get_file()
-                    
-                    # Имя файла
-                    file_ext = file.file_path.split('.')[-1]
-                    filename = f'photo_{idx:02d}.{file_ext}'
-                    filepath = group_dir / filename
-                    
-                    # Скачивание
-                    await file.download_to_drive(filepath)
-                    
-                    group_info['files'].append({
-                        'file_id': photo.file_id,
-                        'filename': filename,
-                        'size': photo.file_size,
-                        'width': photo.width,
-                        'height': photo.height
-                    })
-                    
-                    logger.info(f"Сохранено: {filepath}")
+            # Получение caption из первого сообщения
+            if messages[0].caption:
+                group_info.caption = messages[0].caption
+            
+            # Информация об отправителе (последний известный) и чате
+            for msg in reversed(messages):
+                if msg.sender:
+                    group_info.sender = msg.sender
+                    break
+            group_info.chat_id = messages[-1].chat_id
+            
+            photos = [(idx, msg) for idx, msg in enumerate(messages, 1) if msg.photo_id]
+            
+            # Параллельное скачивание фото
+            results = await asyncio.gather(
+                *(self._download_photo(bot, msg, group_dir, idx) for idx, msg in photos),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            # gather возвращает список готового размера, он и становится files
+            group_info.files = results
             
             # Сохранение информации о группе
             info_file = group_dir / 'info.json'
-            with open(info_file, 'w', encoding='utf-8') as f:
-                json.dump(group_info, f, ensure_ascii=False, indent=2)
+            await self._run_io(_write_json_sync, info_file, group_info)
             
             # Обновление общих метаданных
-            self.metadata['groups'].append({
+            entry = {
                 'group_id': media_group_id,
                 'folder': group_dir.name,
-                'date': group_info['date'],
-                'files_count': len(group_info['files']),
-                'caption': group_info['caption'][:100] if group_info['caption'] else ''
-            })
-            self.metadata['total_files'] += len(group_info['files'])
-            self._save_metadata()
+                'date': group_info.date,
+                'files_count': len(group_info.files),
+                'caption': group_info.caption[:100]
+            }
+            async with self._metadata_lock:
+                self.metadata['groups'].append(entry)
+                self.metadata['total_files'] += len(group_info.files)
+                self.groups_count += 1
+                self.total_files += len(group_info.files)
+                await self._append_journal(entry)
             
-            logger.info(f"✅ Группа {media_group_id} сохранена в {group_dir}")
+            logger.info("✅ Группа %s сохранена в %s", media_group_id, group_dir)
             return True
             
         except Exception as e:
-            logger.error(f"Ошибка сохранения группы {media_group_id}: {e}")
+            logger.error("Ошибка сохранения группы %s: %s", media_group_id, e)
             return False
 
 
@@ -144,45 +413,73 @@ class MediaArchiver:
 archiver = MediaArchiver(DOWNLOAD_DIR)
 
 
+async def flush_media_group(bot: Bot, media_group_id: str):
+    """Сохранение накопленного альбома (один раз на media_group_id)"""
+    media_group_timers.pop(media_group_id, None)
+    messages = media_group_buffer.pop(media_group_id, None)
+    if not messages:
+        return
+    
+    # Сохранение группы
+    success = await archiver.save_media_group(bot, media_group_id, messages)
+    
+    # Подтверждение не отправляется в каналы: там оно стало бы публичным постом
+    if success and messages[0].chat_type != Chat.CHANNEL:
+        # Отправка подтверждения
+        first = messages[0]
+        await bot.send_message(
+            first.chat_id,
+            f"✅ Сохранено {len(messages)} фото из альбома",
+            reply_to_message_id=first.message_id
+        )
+
+
+def _schedule_flush(application: Application, update: Update, media_group_id: str):
+    """Запуск сохранения альбома по истечении таймера
+    
+    Задача создаётся через Application: stop() дождётся её завершения,
+    а ошибки попадут в обработчики ошибок бота.
+    """
+    if not application.running:
+        # Идёт остановка: Application уже не отслеживает новые задачи,
+        # альбом остаётся в буфере и сохраняется в post_stop
+        return
+    application.create_task(
+        flush_media_group(application.bot, media_group_id),
+        update=update
+    )
+
+
 async def handle_media(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Обработчик медиа-сообщений"""
-    message = update.message
+    """Обработчик медиа-сообщений (из чатов и каналов)"""
+    message = update.effective_message
     
     # Проверка на медиа-группу
     if message.media_group_id:
         media_group_id = message.media_group_id
         
         # Добавление сообщения в буфер
-        media_group_buffer[media_group_id].append(message)
+        media_group_buffer[media_group_id].append(BufferedMsg(message))
         
-        # Ожидание получения всех сообщений группы (задержка)
-        await asyncio.sleep(1)
-        
-        # Проверка, что это последнее сообщение в группе
-        if media_group_buffer[media_group_id]:
-            messages = media_group_buffer[media_group_id]
-            
-            # Сохранение группы
-            success = await archiver.save_media_group(media_group_id, messages)
-            
-            if success:
-                # Отправка подтверждения
-                await message.reply_text(
-                    f"✅ Сохранено {len(messages)} фото из альбома"
-                )
-            
-            # Очистка буфера
-            del media_group_buffer[media_group_id]
+        # Сохранение откладывается до паузы в поступлении сообщений группы:
+        # каждое новое сообщение переносит таймер
+        timer = media_group_timers.get(media_group_id)
+        if timer:
+            timer.cancel()
+        loop = asyncio.get_running_loop()
+        media_group_timers[media_group_id] = loop.call_later(
+            MEDIA_GROUP_DELAY, _schedule_flush, context.application, update, media_group_id
+        )
     
     # Одиночное фото (не в группе)
     elif message.photo:
-        photo = message.photo[-1]
-        
         # Создание "группы" из одного фото
         single_id = f"single_{message.message_id}"
-        success = await archiver.save_media_group(single_id, [message])
+        success = await archiver.save_media_group(
+            context.bot, single_id, [BufferedMsg(message)]
+        )
         
-        if success:
+        if success and message.chat.type != Chat.CHANNEL:
             await message.reply_text("✅ Фото сохранено")
 
 
@@ -193,7 +490,8 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Отправьте мне фото или альбом фотографий, "
         "и я сохраню их на локальный диск с описаниями.\n\n"
         "📁 Все файлы сохраняются в папку `downloads/media_groups/`\n"
-        "📋 Метаданные хранятся в `downloads/metadata.json`",
+        "📋 Метаданные хранятся в `downloads/metadata.json` "
+        "и журнале новых групп `downloads/metadata.jsonl`",
         parse_mode='Markdown'
     )
 
@@ -202,13 +500,30 @@ async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Статистика сохранённых файлов"""
     stats_text = (
         f"📊 *Статистика архивации*\n\n"
-        f"📁 Всего групп: {len(archiver.metadata['groups'])}\n"
-        f"🖼 Всего файлов: {archiver.metadata['total_files']}\n"
+        f"📁 Всего групп: {archiver.groups_count}\n"
+        f"🖼 Всего файлов: {archiver.total_files}\n"
         f"💾 Папка: `{archiver.media_groups_dir}`"
     )
     await update.message.reply_text(stats_text, parse_mode='Markdown')
 
 
+async def post_stop(application: Application):
+    """Сохранение альбомов, таймер которых не успел сработать до остановки"""
+    for timer in media_group_timers.values():
+        timer.cancel()
+    
+    for media_group_id in list(media_group_buffer):
+        try:
+            await flush_media_group(application.bot, media_group_id)
+        except Exception as e:
+            logger.error("Ошибка сохранения альбома %s при остановке: %s", media_group_id, e)
+
+
+async def post_shutdown(application: Application):
+    """Освобождение ресурсов архиватора после остановки бота"""
+    await archiver.close()
+
+
 def main():
     """Запуск бота"""
     if not BOT_TOKEN:
@@ -216,10 +531,25 @@ def main():
         return
     
     logger.info("🚀 Запуск Telegram Media Archiver...")
-    logger.info(f"📁 Директория загрузок: {DOWNLOAD_DIR.absolute()}")
+    logger.info("📁 Директория загрузок: %s", DOWNLOAD_DIR.absolute())
+    
+    # Более быстрый event loop на основе libuv (Linux/macOS), если установлен
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("⚡ Используется uvloop")
     
     # Создание приложения
-    application = Application.builder().token(BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .post_stop(post_stop)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
     
     # Обработчики
     application.add_handler(MessageHandler(
@@ -234,7 +564,9 @@ def main():
     
     # Запуск
     logger.info("✅ Бот запущен и ожидает сообщений...")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    # Бот обрабатывает только новые сообщения чатов и посты каналов (фото
+    # и команды), остальные типы обновлений Telegram не присылает вовсе
+    application.run_polling(allowed_updates=[Update.MESSAGE, Update.CHANNEL_POST])
 
 
 if __name__ == '__main__':